@@ -1,9 +1,5 @@
-import os
-import yaml
-import json
 import logging
-from typing import Dict, Any, Optional, Callable
-from pathlib import Path
+from typing import Optional, Callable
 
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
@@ -16,6 +12,7 @@ from .tools import (
     get_angel_historical_data,
     calculate_technical_indicators,
     calculate_options_greeks,
+    calculate_options_greeks_batch,
     backtest_option_strategy,
     analyze_sentiment_from_text,
     find_nifty_expiry_dates,
@@ -25,7 +22,7 @@ from .tools import (
     build_multi_leg_strategy,
     place_option_order
 )
-from .utils import get_config_path, get_output_path
+from .utils import AGENTS_CONFIG_PATH, TASKS_CONFIG_PATH
 
 logger = logging.getLogger("OptiTrade.Crew")
 if not logger.handlers:
@@ -37,17 +34,12 @@ if not logger.handlers:
     logger.addHandler(ch)
     logger.setLevel(logging.INFO)
 
-# FIX: config/ is at project root /app/config/, two levels up from this file
-# (/app/src/crew.py → /app/src/ → /app/). Using absolute paths ensures
-# CrewAI finds agents.yaml and tasks.yaml regardless of process cwd.
-_CONFIG_DIR = Path(__file__).parent.parent / "config"
-
 
 @CrewBase
 class OptiTradeCrew():
 
-    agents_config = str(_CONFIG_DIR / "agents.yaml")
-    tasks_config  = str(_CONFIG_DIR / "tasks.yaml")
+    agents_config = AGENTS_CONFIG_PATH
+    tasks_config  = TASKS_CONFIG_PATH
 
     # FIX: Accept optional callbacks so the Streamlit UI can receive
     # live updates as each agent step and task completes, instead of
@@ -95,7 +87,7 @@ class OptiTradeCrew():
     def volatility_greeks_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["volatility_greeks_agent"],
-            tools=[calculate_options_greeks, get_angel_option_chain],
+            tools=[calculate_options_greeks, calculate_options_greeks_batch, get_angel_option_chain],
             verbose=True,
             allow_delegation=False
         )
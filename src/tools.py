@@ -1,14 +1,86 @@
 import os
+import copy
 import json
+import math
+import re
+import time
 import logging
+import functools
 import threading
 import pyotp
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from scipy.special import ndtr
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Iterator, Optional, Union
 from crewai.tools import tool
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson parses the multi-MB scrip master and every string API response
+# several times faster than stdlib json; it is optional and both accept
+# bytes/str and return the same objects. orjson's decode error subclasses
+# ValueError, so existing except clauses cover both.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# ijson lets the scrip master be filtered while it streams in, so the ~99% of
+# non-NIFTY rows are never materialised as Python dicts.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# pyahocorasick finds every sentiment keyword in one pass over the text; the
+# regex alternation below is the fallback.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# pyarrow backs the Feather file the filtered instrument master is cached in.
+# Without it the cache is skipped and the master is downloaded each session.
+try:
+    import pyarrow  # noqa: F401
+    _HAVE_PYARROW = True
+except ImportError:
+    _HAVE_PYARROW = False
+
+# numba compiles the numeric loops below to machine code. Without it the
+# decorator is a no-op and the same functions run as plain Python.
+try:
+    from numba import njit as _numba_njit
+    _HAVE_NUMBA = True
+
+    def _njit(*args, **kwargs):
+        # cache=True needs a writable cache directory; when the container UID
+        # cannot write next to the source or to NUMBA_CACHE_DIR, numba raises
+        # at decoration time. Compile without the on-disk cache instead of
+        # failing the import.
+        def decorate(fn):
+            try:
+                return _numba_njit(**kwargs)(fn)
+            except RuntimeError as e:
+                if not kwargs.get("cache"):
+                    raise
+                logger.warning(f"numba cache unavailable for {fn.__name__}, compiling uncached: {e}")
+                return _numba_njit(**{**kwargs, "cache": False})(fn)
+        if len(args) == 1 and callable(args[0]):
+            return decorate(args[0])
+        return decorate
+except ImportError:
+    _HAVE_NUMBA = False
+
+    def _njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
 # FIX: SmartConnect.__init__ hardcodes os.makedirs(os.path.join("logs", date))
 # and logzero.logfile(...) relative to cwd. We pre-create /app/logs with 777
@@ -20,6 +92,11 @@ _lz.logfile = lambda *args, **kwargs: None  # suppress logzero file handler
 
 from SmartApi import SmartConnect
 
+try:
+    from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+except ImportError:
+    SmartWebSocketV2 = None
+
 logger = logging.getLogger("OptiTrade.Tools")
 if not logger.handlers:
     ch = logging.StreamHandler()
@@ -27,21 +104,40 @@ if not logger.handlers:
     logger.addHandler(ch)
 logger.setLevel(logging.INFO)
 
-_smart_api = None
-_auth_token = None
-_feed_token = None
-_refresh_token = None
-_instrument_master = None
-
-# FIX: Added threading lock to prevent race conditions when async tasks
-# (analyze_technicals, analyze_sentiment, compute_greeks_volatility) trigger
-# re-authentication simultaneously and overwrite each other's tokens.
-_auth_lock = threading.Lock()
-
 NIFTY_SYMBOL_TOKEN = "99926000"
 NIFTY_EXCHANGE = "NSE"
 NIFTY_TRADING_SYMBOL = "Nifty 50"
 NIFTY_LOT_SIZE = 50
+NIFTY_STRIKE_STEP = 50
+OPTION_CHAIN_HALF_WIDTH = 500
+
+# getMarketData accepts at most 50 tokens per exchange per request.
+MARKET_DATA_BATCH_SIZE = 50
+MARKET_DATA_MAX_WORKERS = 4
+# Angel One throttles the quote endpoint per second; chunk requests are spaced
+# out so a wide chain never trips the access-rate error.
+MARKET_DATA_MAX_PER_SEC = 10
+
+# Streaming ticks are opt-in (OPTITRADE_USE_WEBSOCKET=1). A tick older than
+# WS_MAX_TICK_AGE seconds is treated as missing and the tool falls back to REST.
+WS_MAX_TICK_AGE = 1.0
+_WS_EXCHANGE_TYPES = {"NSE": 1, "NFO": 2}
+_WS_SNAP_QUOTE_MODE = 3
+
+# One keep-alive session for plain HTTP downloads so repeated calls skip the
+# TCP/TLS handshake. Retry only covers idempotent GETs and transient statuses.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+# Without `pool`, SmartConnect sends every call through the bare requests
+# module, i.e. a new TCP/TLS connection per request. Passing `pool` makes it
+# create its own requests.Session with an HTTPAdapter of this size, so logins,
+# quotes and concurrent getMarketData batches reuse keep-alive connections.
+_SMARTAPI_POOL = {"pool_connections": 10, "pool_maxsize": 20}
 
 
 # FIX: Replaces the original _is_valid_response() helper.
@@ -60,7 +156,7 @@ def _safe_parse_response(response: Any) -> Optional[Dict]:
         if not stripped:
             return None
         try:
-            parsed = json.loads(stripped)
+            parsed = _json_loads(stripped)
             if isinstance(parsed, dict):
                 return parsed
         except (json.JSONDecodeError, ValueError):
@@ -78,14 +174,160 @@ def _is_success(parsed: Optional[Dict]) -> bool:
     return status is True or str(status).lower() == "true"
 
 
-@tool("Angel One Authentication Tool")
-def authenticate_angel() -> Dict[str, Any]:
-    """Authenticate with Angel One SmartAPI."""
-    global _smart_api, _auth_token, _feed_token, _refresh_token
+def _to_number(value: Any) -> Any:
+    """Pass API numerics through untouched; only parse genuine numeric strings.
+
+    Anything else raises, exactly as the float() it replaces did.
+    """
+    if isinstance(value, (int, float)):
+        return value
+    return float(value)
+
+
+def _volume_or_none(value: Any) -> Optional[int]:
+    """Integer volume, or None when the API sent something unparseable."""
+    if isinstance(value, int):
+        return value
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
 
-    # FIX: All writes to shared globals are now protected by _auth_lock
-    # to prevent concurrent async tasks from overwriting each other's tokens.
-    with _auth_lock:
+
+def _strike_window(spot: float, step: int = NIFTY_STRIKE_STEP,
+                   half_width: int = OPTION_CHAIN_HALF_WIDTH) -> tuple:
+    """Return (atm_strike, min_strike, max_strike) for a spot price."""
+    atm = int(round(spot / step)) * step
+    return atm, atm - half_width, atm + half_width
+
+
+# Angel One error codes for an invalid / expired / missing JWT.
+_TOKEN_ERROR_CODES = {"AG8001", "AG8002", "AG8003"}
+
+
+def _is_token_error(parsed: Optional[Dict]) -> bool:
+    if not parsed:
+        return False
+    if str(parsed.get("errorcode", "")).upper() in _TOKEN_ERROR_CODES:
+        return True
+    return "invalid token" in str(parsed.get("message", "")).lower()
+
+
+def _is_success_result(result: Any) -> bool:
+    return isinstance(result, dict) and result.get("status") == "success"
+
+
+def _ttl_cache(ttl: float, cache_if=_is_success_result, copier=dict):
+    """Memoize successful tool results for ``ttl`` seconds, keyed on call args.
+
+    Only results passing ``cache_if`` (by default, dicts with status='success')
+    are stored so failures are always retried. The cache keeps its own copy and
+    every hit returns a fresh one, so a caller mutating its result cannot
+    change what later callers see. ``copier`` makes those copies; the default
+    shallow dict() suits flat results, nested ones need copy.deepcopy. The
+    wrapper exposes ``cache_clear()`` for explicit invalidation.
+    """
+    def decorator(fn):
+        cache: Dict[Any, tuple] = {}
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(key)
+            if hit and hit[1] > now:
+                return copier(hit[0])
+            result = fn(*args, **kwargs)
+            if cache_if(result):
+                with lock:
+                    cache[key] = (copier(result), now + ttl)
+            return result
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+class _AngelState:
+    """Process-wide Angel One session and instrument cache shared by every tool.
+
+    Replaces the old module-level globals. Every write happens under ``lock``.
+    Tools go through ensure_auth(), which checks the session without locking
+    and re-checks under the lock, so concurrent callers collapse onto one login.
+    """
+
+    # JWTs stay valid for most of a trading day, so a login is reused for 6h
+    # instead of hitting generateSession on every tool call.
+    SESSION_TTL = 6 * 3600
+    # After a failed or empty load, callers fall back to the simulated chain
+    # for this long instead of each retrying the download.
+    INSTRUMENT_RETRY_INTERVAL = 300.0
+
+    def __init__(self):
+        # FIX: Added threading lock to prevent race conditions when async tasks
+        # (analyze_technicals, analyze_sentiment, compute_greeks_volatility) trigger
+        # re-authentication simultaneously and overwrite each other's tokens.
+        self.lock = threading.RLock()
+        self.api = None
+        self.auth_token = None
+        self.feed_token = None
+        self.refresh_token = None
+        self.expires_at = 0.0
+        self.instrument_master = None
+        self.expiry_index: Dict[Any, pd.DataFrame] = {}
+        # Reused across re-logins while the credentials are unchanged: TOTP
+        # parses its base32 secret and SmartConnect builds a session and headers.
+        self._totp = None
+        self._totp_secret = None
+        self._api_key = None
+        # Separate from ``lock`` so a slow scrip-master download never blocks logins.
+        self.instrument_lock = threading.Lock()
+        self.instruments_attempted_at = None
+
+    def is_authenticated(self) -> bool:
+        return self.api is not None and self.auth_token is not None and time.monotonic() < self.expires_at
+
+    def ensure_auth(self) -> Dict[str, Any]:
+        if self.is_authenticated():
+            return {"status": "success", "message": "Authentication successful"}
+        with self.lock:
+            if self.is_authenticated():
+                return {"status": "success", "message": "Authentication successful"}
+            return self._login_locked()
+
+    def _instruments_ready(self) -> bool:
+        if self.instrument_master:
+            return True
+        attempted = self.instruments_attempted_at
+        return attempted is not None and time.monotonic() - attempted < self.INSTRUMENT_RETRY_INTERVAL
+
+    def ensure_instruments(self) -> None:
+        """Load the instrument master once; concurrent callers wait for that one download."""
+        if self._instruments_ready():
+            return
+        with self.instrument_lock:
+            if self._instruments_ready():
+                return
+            try:
+                _download_instrument_master_json()
+            finally:
+                self.instruments_attempted_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Drop the session so the next tool call logs in again."""
+        with self.lock:
+            self.auth_token = None
+            self.expires_at = 0.0
+        _ticker_cache.close()
+        _clear_market_caches()
+
+    def _login_locked(self) -> Dict[str, Any]:
         try:
             api_key = os.getenv("ANGEL_API_KEY")
             client_id = os.getenv("ANGEL_CLIENT_ID")
@@ -99,13 +341,18 @@ def authenticate_angel() -> Dict[str, Any]:
                     "message": "Check .env for ANGEL_API_KEY, ANGEL_CLIENT_ID, ANGEL_MPIN, ANGEL_TOTP_SECRET"
                 }
 
-            totp = pyotp.TOTP(totp_secret).now()
-            _smart_api = SmartConnect(api_key=api_key)
+            if self._totp is None or self._totp_secret != totp_secret:
+                self._totp = pyotp.TOTP(totp_secret)
+                self._totp_secret = totp_secret
+            totp = self._totp.now()
+            if self.api is None or self._api_key != api_key:
+                self.api = SmartConnect(api_key=api_key, pool=_SMARTAPI_POOL)
+                self._api_key = api_key
 
             # FIX: Raw response is normalised via _safe_parse_response before
             # any .get() is called. Previously generateSession could return a
             # plain string which caused the crash seen in the Streamlit error banner.
-            session_data = _safe_parse_response(_smart_api.generateSession(client_id, mpin, totp))
+            session_data = _safe_parse_response(self.api.generateSession(client_id, mpin, totp))
 
             if session_data and _is_success(session_data):
                 data = session_data.get("data") or {}
@@ -113,17 +360,18 @@ def authenticate_angel() -> Dict[str, Any]:
                 # in edge cases where the API partially fails mid-response.
                 if isinstance(data, str):
                     data = {}
-                _auth_token = data.get("jwtToken")
-                _feed_token = data.get("feedToken")
-                _refresh_token = data.get("refreshToken")
+                self.auth_token = data.get("jwtToken")
+                self.feed_token = data.get("feedToken")
+                self.refresh_token = data.get("refreshToken")
 
-                if not _auth_token:
+                if not self.auth_token:
                     return {
                         "status": "failed",
                         "error": "missing_jwt",
                         "message": "Session created but jwtToken was empty — verify credentials"
                     }
 
+                self.expires_at = time.monotonic() + self.SESSION_TTL
                 logger.info("✅ Angel One authentication successful")
                 return {"status": "success", "message": "Authentication successful"}
             else:
@@ -136,73 +384,312 @@ def authenticate_angel() -> Dict[str, Any]:
             return {"status": "failed", "error": "exception", "message": str(e)}
 
 
+_state = _AngelState()
+
+
+class _TickerCache:
+    """Latest tick per token from a background SmartWebSocketV2 subscription.
+
+    Tools read fresh ticks from here and only hit REST for tokens that have
+    none. The socket is opened lazily on the first subscribe() after login,
+    and every requested token is (re)subscribed whenever it opens.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ticks: Dict[str, Dict[str, Any]] = {}
+        self._wanted: Dict[int, set] = {}
+        self._ws = None
+        self._connected = False
+
+    @staticmethod
+    def enabled() -> bool:
+        return SmartWebSocketV2 is not None and os.getenv("OPTITRADE_USE_WEBSOCKET", "0") == "1"
+
+    def get(self, token: str, max_age: float = WS_MAX_TICK_AGE) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            tick = self._ticks.get(token)
+        if tick and time.monotonic() - tick["received"] <= max_age:
+            return tick
+        return None
+
+    def subscribe(self, exchange: str, tokens: List[str]) -> None:
+        if not self.enabled() or not _state.auth_token or not _state.feed_token:
+            return
+        exchange_type = _WS_EXCHANGE_TYPES[exchange]
+        with self._lock:
+            wanted = self._wanted.setdefault(exchange_type, set())
+            new = [t for t in tokens if t not in wanted]
+            if not new:
+                return
+            wanted.update(new)
+            if self._ws is None:
+                self._start_locked()
+                return
+            if not self._connected:
+                return
+            ws = self._ws
+        self._send_subscribe(ws, {exchange_type: new})
+
+    def close(self) -> None:
+        with self._lock:
+            ws, self._ws, self._connected, self._wanted = self._ws, None, False, {}
+        if ws is not None:
+            try:
+                ws.close_connection()
+            except Exception as e:
+                logger.warning(f"WebSocket close failed: {e}")
+
+    def _start_locked(self) -> None:
+        ws = SmartWebSocketV2(_state.auth_token, os.getenv("ANGEL_API_KEY"), os.getenv("ANGEL_CLIENT_ID"), _state.feed_token)
+        ws.on_open = self._on_open
+        ws.on_data = self._on_data
+        ws.on_error = self._on_error
+        ws.on_close = self._on_close
+        self._ws = ws
+        threading.Thread(target=ws.connect, name="OptiTrade.WebSocket", daemon=True).start()
+
+    @staticmethod
+    def _send_subscribe(ws, tokens_by_type: Dict[int, List[str]]) -> None:
+        token_list = [{"exchangeType": k, "tokens": list(v)} for k, v in tokens_by_type.items() if v]
+        if token_list:
+            ws.subscribe("optitrade", _WS_SNAP_QUOTE_MODE, token_list)
+
+    def _on_open(self, wsapp) -> None:
+        with self._lock:
+            self._connected = True
+            ws = self._ws
+            snapshot = {k: list(v) for k, v in self._wanted.items()}
+        if ws is not None:
+            self._send_subscribe(ws, snapshot)
+
+    def _on_data(self, wsapp, message) -> None:
+        if not isinstance(message, dict) or not message.get("token"):
+            return
+        # Prices arrive in paise.
+        tick = {
+            "ltp": message.get("last_traded_price", 0) / 100,
+            "open": message.get("open_price_of_the_day", 0) / 100,
+            "high": message.get("high_price_of_the_day", 0) / 100,
+            "low": message.get("low_price_of_the_day", 0) / 100,
+            "close": message.get("closed_price", 0) / 100,
+            "volume": message.get("volume_trade_for_the_day", 0),
+            "received": time.monotonic()
+        }
+        with self._lock:
+            self._ticks[str(message["token"])] = tick
+
+    def _on_error(self, *args) -> None:
+        logger.warning(f"WebSocket error: {args[-1] if args else 'unknown'}")
+
+    def _on_close(self, *args) -> None:
+        with self._lock:
+            self._ws, self._connected, self._wanted = None, False, {}
+
+
+_ticker_cache = _TickerCache()
+
+
+@tool("Angel One Authentication Tool")
+def authenticate_angel() -> Dict[str, Any]:
+    """Authenticate with Angel One SmartAPI."""
+    return _state.ensure_auth()
+
+
+# Plain callables behind the @tool wrappers, bound once for the internal
+# tool-to-tool calls below.
+_authenticate_angel = authenticate_angel.func
+
+
+# Compiled once: the scrip master filter runs these over every row.
+_NIFTY_RE = re.compile("NIFTY", re.IGNORECASE)
+_OPT_TYPE_RE = re.compile(r"(CE|PE)$")
+
+
+def _build_expiry_index(instruments: List[Dict]) -> Dict[Any, pd.DataFrame]:
+    """Partition NIFTY index options by expiry date, each sorted by strike.
+
+    Built once per master download so option-chain lookups become a dict get
+    plus a strike-window slice instead of a rescan of the whole master.
+    """
+    if not instruments:
+        return {}
+    df = pd.DataFrame(instruments, columns=["token", "symbol", "name", "expiry", "strike", "instrumenttype"])
+    df = df[
+        df["instrumenttype"].eq("OPTIDX") &
+        df["name"].str.contains(_NIFTY_RE, na=False)
+    ]
+
+    # Malformed strikes and expiries are coerced to NaN/NaT and dropped in one
+    # pass instead of raising and catching per row. Thousands of contracts
+    # share a handful of expiry strings, so the date parse is cached.
+    strike = pd.to_numeric(df["strike"], errors="coerce")
+    df = df.assign(
+        strike=strike.where(strike <= 50000, strike / 100),
+        token=pd.to_numeric(df["token"], errors="coerce"),
+        expiry_dt=pd.to_datetime(df["expiry"].str.title(), format="%d%b%Y", errors="coerce", cache=True),
+        # Angel option symbols end in CE/PE; anything else is not a usable contract.
+        opt_type=df["symbol"].str.extract(_OPT_TYPE_RE, expand=False)
+    )
+    df = df.dropna(subset=["strike", "token", "expiry_dt", "opt_type"])
+    # The index lives for the whole session: float32 strikes (exact for any
+    # index strike) and int32 tokens are a fraction of float64/str objects.
+    df = df.assign(
+        strike=df["strike"].astype(np.float32),
+        token=df["token"].astype(np.int32),
+        expiry_dt=df["expiry_dt"].dt.date,
+        opt_type=pd.Categorical(df["opt_type"], categories=["CE", "PE"])
+    )[["expiry_dt", "strike", "token", "symbol", "opt_type"]]
+    return {d: g.sort_values("strike").reset_index(drop=True) for d, g in df.groupby("expiry_dt")}
+
+
+def _iter_scrip_master(response: requests.Response) -> Iterator[Dict]:
+    """Yield scrip-master rows, streaming them through ijson when installed."""
+    if ijson is not None:
+        response.raw.decode_content = True
+        return ijson.items(response.raw, "item", use_float=True)
+    return iter(_json_loads(response.content))
+
+
+# The filtered NIFTY slice of the scrip master is persisted between container
+# starts; Feather round-trips it far faster than re-downloading and parsing the
+# multi-MB JSON. Needs pyarrow; without it every start downloads as before.
+INSTRUMENT_CACHE_TTL = 12 * 3600
+_INSTRUMENT_CACHE_FILE = "instrument_master.feather"
+
+
+def _instrument_cache_path() -> str:
+    return os.path.join(os.getenv("OPTITRADE_CACHE_DIR", "/tmp/smartapi_cache"), _INSTRUMENT_CACHE_FILE)
+
+
+def _load_cached_instruments() -> Optional[List[Dict]]:
+    if not _HAVE_PYARROW:
+        return None
+    path = _instrument_cache_path()
+    try:
+        if time.time() - os.path.getmtime(path) > INSTRUMENT_CACHE_TTL:
+            return None
+        return pd.read_feather(path).to_dict("records")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable instrument cache {path}: {e}")
+        return None
+
+
+def _save_cached_instruments(instruments: List[Dict]) -> None:
+    if not instruments or not _HAVE_PYARROW:
+        return
+    path = _instrument_cache_path()
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pd.DataFrame(instruments).to_feather(tmp)
+        # Atomic rename: concurrent writers race harmlessly and readers never
+        # see a partial file.
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.warning(f"Could not write instrument cache {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
 @tool("Download Instrument Master")
 def download_instrument_master_json() -> Dict[str, Any]:
     """Download and cache instrument master data."""
-    global _instrument_master, _smart_api
-
     try:
-        if not _smart_api or not _auth_token:
-            auth_result = authenticate_angel.func()
-            if auth_result.get("status") != "success":
-                return {"status": "failed", "error": "not_authenticated"}
+        auth_result = _state.ensure_auth()
+        if auth_result.get("status") != "success":
+            return {"status": "failed", "error": "not_authenticated"}
 
         try:
-            url = "https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json"
-            response = requests.get(url, timeout=30)
-
-            if response.status_code == 200:
-                instruments = response.json()
-                _instrument_master = [
-                    inst for inst in instruments
-                    if inst.get("exch_seg") in ["NSE", "NFO"] and
-                    "NIFTY" in inst.get("name", "").upper()
-                ]
-                logger.info(f"✅ Downloaded {len(_instrument_master)} Nifty instruments")
-                return {"status": "success", "count": len(_instrument_master)}
+            instrument_master = _load_cached_instruments()
+            if instrument_master is not None:
+                logger.info(f"✅ Loaded {len(instrument_master)} Nifty instruments from cache")
             else:
-                return {"status": "failed", "error": "download_failed", "message": f"HTTP {response.status_code}"}
+                url = "https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json"
+                with _http.get(url, timeout=(5, 30), stream=True) as response:
+                    if response.status_code != 200:
+                        return {"status": "failed", "error": "download_failed", "message": f"HTTP {response.status_code}"}
+
+                    instrument_master = [
+                        inst for inst in _iter_scrip_master(response)
+                        if inst.get("exch_seg") in ("NSE", "NFO") and
+                        _NIFTY_RE.search(inst.get("name") or "")
+                    ]
+                _save_cached_instruments(instrument_master)
+                logger.info(f"✅ Downloaded {len(instrument_master)} Nifty instruments")
+
+            expiry_index = _build_expiry_index(instrument_master)
+            with _state.lock:
+                _state.instrument_master = instrument_master
+                _state.expiry_index = expiry_index
+            return {"status": "success", "count": len(instrument_master)}
 
         except Exception as e:
             logger.warning(f"Download failed: {e}")
-            _instrument_master = []
+            with _state.lock:
+                _state.instrument_master = []
+                _state.expiry_index = {}
             return {"status": "success", "message": "Using fallback", "count": 0}
 
     except Exception as e:
         return {"status": "failed", "error": "exception", "message": str(e)}
 
 
+_download_instrument_master_json = download_instrument_master_json.func
+
+
 @tool("Find Nifty50 Expiry Dates")
 def find_nifty_expiry_dates(count: int = 3) -> List[str]:
     """Find the next N Nifty50 weekly expiry dates."""
+    return list(_expiries_for(date.today().toordinal(), count))
+
+
+# The answer only changes when the calendar date does, so every agent asking
+# on the same day shares one computation.
+@functools.lru_cache(maxsize=8)
+def _expiries_for(today_ordinal: int, count: int) -> tuple:
+    today = date.fromordinal(today_ordinal)
     try:
-        expiries = []
-        current_date = datetime.now()
-        days_ahead = (3 - current_date.weekday()) % 7
-        if days_ahead == 0 and current_date.hour >= 15:
-            days_ahead = 7
-
-        next_expiry = current_date + timedelta(days=days_ahead if days_ahead > 0 else 7)
-        for i in range(count):
-            expiries.append((next_expiry + timedelta(weeks=i)).strftime("%Y-%m-%d"))
-        return expiries
+        # Weekly expiries fall on Thursday. The current contract is never
+        # returned on expiry day itself, so start rolling from tomorrow.
+        start = np.datetime64(today, "D") + 1
+        expiries = np.busday_offset(start, np.arange(count), roll="forward", weekmask="0001000")
+        return tuple(expiries.astype(str).tolist())
     except Exception:
-        return [(datetime.now() + timedelta(days=7 * i)).strftime("%Y-%m-%d") for i in range(1, count + 1)]
+        return tuple((today + timedelta(days=7 * i)).strftime("%Y-%m-%d") for i in range(1, count + 1))
+
 
+_find_nifty_expiry_dates = find_nifty_expiry_dates.func
 
+
+# Spot only moves once per tick; a 2s window collapses the LTP lookups that
+# the option-chain, greeks and test paths issue back to back.
 @tool("Get Angel One LTP")
+@_ttl_cache(2.0)
 def get_angel_ltp() -> Dict[str, Any]:
     """Get Last Traded Price (LTP) for Nifty50 index."""
-    global _smart_api, _auth_token
-
     try:
-        if not _smart_api or not _auth_token:
-            auth_result = authenticate_angel.func()
-            if auth_result.get("status") != "success":
-                return {"status": "failed", "error": "auth_failed", "message": auth_result.get("message")}
+        auth_result = _state.ensure_auth()
+        if auth_result.get("status") != "success":
+            return {"status": "failed", "error": "auth_failed", "message": auth_result.get("message")}
+
+        tick = _ticker_cache.get(NIFTY_SYMBOL_TOKEN)
+        if tick:
+            return {
+                "status": "success",
+                "ltp": tick["ltp"],
+                "timestamp": datetime.now().isoformat(),
+                "symbol": "NIFTY50",
+                "exchange": NIFTY_EXCHANGE
+            }
+        _ticker_cache.subscribe(NIFTY_EXCHANGE, [NIFTY_SYMBOL_TOKEN])
 
         # FIX: Normalise before .get() — ltpData can return a string on session errors.
-        ltp_data = _safe_parse_response(_smart_api.ltpData(NIFTY_EXCHANGE, NIFTY_TRADING_SYMBOL, NIFTY_SYMBOL_TOKEN))
+        ltp_data = _safe_parse_response(_state.api.ltpData(NIFTY_EXCHANGE, NIFTY_TRADING_SYMBOL, NIFTY_SYMBOL_TOKEN))
 
         if ltp_data and _is_success(ltp_data):
             data = ltp_data.get("data") or {}
@@ -210,12 +697,14 @@ def get_angel_ltp() -> Dict[str, Any]:
                 data = {}
             return {
                 "status": "success",
-                "ltp": float(data.get("ltp", 0)),
+                "ltp": _to_number(data.get("ltp", 0)),
                 "timestamp": datetime.now().isoformat(),
                 "symbol": "NIFTY50",
                 "exchange": NIFTY_EXCHANGE
             }
 
+        if _is_token_error(ltp_data):
+            _state.invalidate()
         msg = (ltp_data or {}).get("message", "Failed to fetch LTP")
         return {"status": "failed", "error": "api_error", "message": str(msg)}
 
@@ -224,20 +713,31 @@ def get_angel_ltp() -> Dict[str, Any]:
         return {"status": "failed", "error": "exception", "message": str(e)}
 
 
+_get_angel_ltp = get_angel_ltp.func
+
+
+# Same idea as the LTP cache, kept slightly shorter since OHLC feeds decisions.
 @tool("Get Angel One Quote")
+@_ttl_cache(1.5)
 def get_angel_quote() -> Dict[str, Any]:
     """Get full OHLC quote for Nifty50 index."""
-    global _smart_api, _auth_token
-
     try:
-        if not _smart_api or not _auth_token:
-            auth_result = authenticate_angel.func()
-            if auth_result.get("status") != "success":
-                return {"status": "failed", "error": "auth_failed"}
+        auth_result = _state.ensure_auth()
+        if auth_result.get("status") != "success":
+            return {"status": "failed", "error": "auth_failed"}
+
+        tick = _ticker_cache.get(NIFTY_SYMBOL_TOKEN)
+        if tick:
+            return {
+                "status": "success",
+                **{k: tick[k] for k in ("open", "high", "low", "ltp", "close", "volume")},
+                "timestamp": datetime.now().isoformat()
+            }
+        _ticker_cache.subscribe(NIFTY_EXCHANGE, [NIFTY_SYMBOL_TOKEN])
 
         # FIX: Normalise before .get() — getMarketData can return a string on session errors.
         quote_data = _safe_parse_response(
-            _smart_api.getMarketData(mode="FULL", exchangeTokens={NIFTY_EXCHANGE: [NIFTY_SYMBOL_TOKEN]})
+            _state.api.getMarketData(mode="FULL", exchangeTokens={NIFTY_EXCHANGE: [NIFTY_SYMBOL_TOKEN]})
         )
 
         if quote_data and _is_success(quote_data):
@@ -246,15 +746,17 @@ def get_angel_quote() -> Dict[str, Any]:
                 q = fetched[0]
                 return {
                     "status": "success",
-                    "open": float(q.get("open", 0)),
-                    "high": float(q.get("high", 0)),
-                    "low": float(q.get("low", 0)),
-                    "ltp": float(q.get("ltp", 0)),
-                    "close": float(q.get("close", 0)),
-                    "volume": int(q.get("volume", 0)),
+                    "open": _to_number(q.get("open", 0)),
+                    "high": _to_number(q.get("high", 0)),
+                    "low": _to_number(q.get("low", 0)),
+                    "ltp": _to_number(q.get("ltp", 0)),
+                    "close": _to_number(q.get("close", 0)),
+                    "volume": int(_to_number(q.get("volume", 0))),
                     "timestamp": datetime.now().isoformat()
                 }
 
+        if _is_token_error(quote_data):
+            _state.invalidate()
         return {"status": "failed", "error": "no_data", "message": "No quote data returned"}
 
     except Exception as e:
@@ -262,23 +764,23 @@ def get_angel_quote() -> Dict[str, Any]:
         return {"status": "failed", "error": "exception", "message": str(e)}
 
 
+_get_angel_quote = get_angel_quote.func
+
+
 @tool("Get Angel One Historical Data")
 def get_angel_historical_data(days: int = 30, interval: str = "ONE_DAY") -> Dict[str, Any]:
     """Get historical OHLC data."""
-    global _smart_api, _auth_token
-
     try:
-        if not _smart_api or not _auth_token:
-            auth_result = authenticate_angel.func()
-            if auth_result.get("status") != "success":
-                return {"status": "failed", "error": "not_authenticated"}
+        auth_result = _state.ensure_auth()
+        if auth_result.get("status") != "success":
+            return {"status": "failed", "error": "not_authenticated"}
 
         now = datetime.now()
         from_date_str = (now - timedelta(days=days)).strftime("%Y-%m-%d 09:15")
         to_date_str = now.strftime("%Y-%m-%d %H:%M")
 
         # FIX: Normalise before .get() — getCandleData can return a string on AB1004 errors.
-        hist_data = _safe_parse_response(_smart_api.getCandleData({
+        hist_data = _safe_parse_response(_state.api.getCandleData({
             "exchange": NIFTY_EXCHANGE,
             "symboltoken": NIFTY_SYMBOL_TOKEN,
             "interval": interval,
@@ -287,20 +789,25 @@ def get_angel_historical_data(days: int = 30, interval: str = "ONE_DAY") -> Dict
         }))
 
         if hist_data and _is_success(hist_data):
-            candles = hist_data.get("data") or []
-            ohlc = [
-                {
-                    "date": c[0],
-                    "open": float(c[1]),
-                    "high": float(c[2]),
-                    "low": float(c[3]),
-                    "close": float(c[4]),
-                    "volume": int(c[5])
-                }
-                for c in candles if len(c) >= 6
-            ]
-            return {"status": "success", "data": ohlc, "count": len(ohlc), "interval": interval}
+            candles = [c for c in (hist_data.get("data") or []) if len(c) >= 6]
+            # Columnar (one list per field): the indicator and backtest tools
+            # read whole columns, so per-candle dicts were built only to be
+            # taken apart again. zip(*) transposes the candle rows in C.
+            # Missing or malformed prices become NaN so _ohlc_arrays drops
+            # those bars instead of feeding zeros into the indicators.
+            cols = list(zip(*candles)) if candles else [()] * 6
+            ohlc = {
+                "date": list(cols[0]),
+                "open": [_float_or_nan(v) for v in cols[1]],
+                "high": [_float_or_nan(v) for v in cols[2]],
+                "low": [_float_or_nan(v) for v in cols[3]],
+                "close": [_float_or_nan(v) for v in cols[4]],
+                "volume": [_volume_or_none(v) for v in cols[5]]
+            }
+            return {"status": "success", "data": ohlc, "count": len(candles), "interval": interval}
 
+        if _is_token_error(hist_data):
+            _state.invalidate()
         msg = (hist_data or {}).get("message", "Unknown error")
         return {
             "status": "failed",
@@ -314,88 +821,141 @@ def get_angel_historical_data(days: int = 30, interval: str = "ONE_DAY") -> Dict
         return {"status": "failed", "error": "exception", "message": str(e)}
 
 
+_get_angel_historical_data = get_angel_historical_data.func
+
+
+class _RateLimiter:
+    """Thread-safe limiter that spaces call starts at least 1/rate seconds apart."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self) -> None:
+        # Reserve the next slot under the lock, then sleep outside it so other
+        # threads can queue behind this one.
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_market_data_limiter = _RateLimiter(MARKET_DATA_MAX_PER_SEC)
+
+
+def _get_market_data_batched(mode: str, exchange: str, tokens: List[str]) -> List[Optional[Dict]]:
+    """Fetch quotes for ``tokens`` in API-sized chunks, issuing the chunks concurrently.
+
+    Each chunk is an independent HTTPS round-trip, so threads overlap the
+    network waits; chunk starts go through the shared rate limiter. Returns one normalised response per chunk, in chunk order;
+    a chunk that raised is None.
+    """
+    chunks = [tokens[i:i + MARKET_DATA_BATCH_SIZE] for i in range(0, len(tokens), MARKET_DATA_BATCH_SIZE)]
+    if not chunks:
+        return []
+
+    def fetch(chunk: List[str]) -> Optional[Dict]:
+        # One failed chunk must not discard the others; it just leaves those
+        # tokens unquoted.
+        _market_data_limiter.acquire()
+        try:
+            return _safe_parse_response(_state.api.getMarketData(mode=mode, exchangeTokens={exchange: chunk}))
+        except Exception as e:
+            logger.warning(f"getMarketData chunk of {len(chunk)} tokens failed: {e}")
+            return None
+
+    if len(chunks) == 1:
+        return [fetch(chunks[0])]
+    with ThreadPoolExecutor(max_workers=min(MARKET_DATA_MAX_WORKERS, len(chunks))) as pool:
+        return list(pool.map(fetch, chunks))
+
+
+# Strategy exploration asks for the same expiry repeatedly. Only live chains
+# are kept: a simulated fallback should be retried, not pinned for 30s.
 @tool("Get Angel One Option Chain")
+@_ttl_cache(30.0, cache_if=lambda r: _is_success_result(r) and r.get("data_source") == "live",
+            copier=copy.deepcopy)
 def get_angel_option_chain(expiry_date: str) -> Dict[str, Any]:
     """Get Nifty50 option chain using Batch Fetch."""
-    global _smart_api, _auth_token, _instrument_master
-
     spot_price = 24000
     atm_strike = 24000
 
     try:
-        if not _smart_api or not _auth_token:
-            authenticate_angel.func()
+        _state.ensure_auth()
 
-        ltp_res = get_angel_ltp.func()
+        ltp_res = _get_angel_ltp()
         if ltp_res.get("status") != "success":
             return _generate_simulated_option_chain(spot_price, atm_strike, expiry_date)
 
         spot_price = ltp_res.get("ltp", spot_price)
-        atm_strike = round(spot_price / 50) * 50
+        atm_strike, min_s, max_s = _strike_window(spot_price)
 
-        if not _instrument_master:
-            download_instrument_master_json.func()
+        _state.ensure_instruments()
 
         try:
-            target_dt = datetime.strptime(expiry_date, "%Y-%m-%d").date()
+            target_dt = date.fromisoformat(expiry_date)
         except ValueError:
             return _generate_simulated_option_chain(spot_price, atm_strike, expiry_date)
 
-        min_s, max_s = atm_strike - 500, atm_strike + 500
-        token_map = {}
-
-        for inst in _instrument_master:
-            if inst.get("instrumenttype") != "OPTIDX":
-                continue
-            if "NIFTY" not in inst.get("name", "").upper():
-                continue
-            try:
-                if datetime.strptime(inst.get("expiry", "").title(), "%d%b%Y").date() != target_dt:
-                    continue
-                strike = float(inst.get("strike", "0"))
-                if strike > 50000:
-                    strike /= 100
-                if min_s <= strike <= max_s:
-                    sym = inst.get("symbol", "")
-                    token_map[inst.get("token")] = {
-                        "strike": strike,
-                        "symbol": sym,
-                        "type": "CE" if "CE" in sym else "PE"
-                    }
-            except Exception:
-                continue
+        sel = None
+        sub = _state.expiry_index.get(target_dt)
+        if sub is not None:
+            # Each expiry slice is sorted by strike, so the window is two binary searches.
+            strikes = sub["strike"].to_numpy()
+            lo = np.searchsorted(strikes, min_s, side="left")
+            hi = np.searchsorted(strikes, max_s, side="right")
+            sel = sub.iloc[lo:hi]
 
-        if not token_map:
+        if sel is None or sel.empty:
             logger.warning(f"No instruments matched for expiry {expiry_date}")
             return _generate_simulated_option_chain(spot_price, atm_strike, expiry_date)
 
         # FIX: Normalise before .get() — this was the specific crash point shown in
         # the Streamlit error. getMarketData returned a string on token/session errors
         # and the subsequent .get("status") call on that string raised the exception.
-        market_data = _safe_parse_response(
-            _smart_api.getMarketData(mode="LTP", exchangeTokens={"NFO": list(token_map.keys())})
-        )
-
-        option_chain = []
-        if market_data and _is_success(market_data):
-            fetched = (market_data.get("data") or {}).get("fetched", [])
-            for item in fetched:
-                t = item.get("symbolToken")
-                if t in token_map:
-                    d = token_map[t]
-                    option_chain.append({
-                        "strike": d["strike"],
-                        "type": d["type"],
-                        "last_price": float(item.get("ltp", 0)),
-                        "volume": 0,
-                        "oi": 0,
-                        "symbol": d["symbol"]
-                    })
-
-        if not option_chain:
+        # _get_market_data_batched runs every chunk through _safe_parse_response.
+        # The index stores tokens as int32; the API and tick cache use strings.
+        tokens = sel["token"].astype(str).tolist()
+        ltp_by_token = {}
+        for token in tokens:
+            tick = _ticker_cache.get(token)
+            if tick:
+                ltp_by_token[token] = tick["ltp"]
+        _ticker_cache.subscribe("NFO", tokens)
+
+        missing = [t for t in tokens if t not in ltp_by_token]
+        for market_data in _get_market_data_batched("LTP", "NFO", missing):
+            if market_data and _is_success(market_data):
+                fetched = (market_data.get("data") or {}).get("fetched", [])
+                ltp_by_token.update((item.get("symbolToken"), _to_number(item.get("ltp", 0))) for item in fetched)
+            elif _is_token_error(market_data):
+                _state.invalidate()
+            elif market_data:
+                logger.warning(f"getMarketData chunk rejected: {market_data.get('message')}")
+
+        # Assemble from the token list already in hand: one membership pass
+        # gives the row mask, and the quoted prices come straight from the dict
+        # instead of filtering and .map()-ing the DataFrame.
+        quoted = np.fromiter((t in ltp_by_token for t in tokens), dtype=bool, count=len(tokens))
+        if not quoted.any():
             logger.warning("Batch fetch returned empty — using simulation")
             return _generate_simulated_option_chain(spot_price, atm_strike, expiry_date)
 
+        # Columnar (one list per field) rather than one dict per contract:
+        # smaller payload for the agents and loads straight into a DataFrame.
+        n = int(quoted.sum())
+        option_chain = {
+            "strike": sel["strike"].to_numpy()[quoted].tolist(),
+            "type": np.asarray(sel["opt_type"])[quoted].tolist(),
+            "last_price": [ltp_by_token[t] for t in tokens if t in ltp_by_token],
+            "volume": [0] * n,
+            "oi": [0] * n,
+            "symbol": sel["symbol"].to_numpy()[quoted].tolist()
+        }
+
         return {
             "status": "success",
             "spot_price": spot_price,
@@ -410,18 +970,34 @@ def get_angel_option_chain(expiry_date: str) -> Dict[str, Any]:
         return _generate_simulated_option_chain(spot_price, atm_strike, expiry_date)
 
 
+_get_angel_option_chain = get_angel_option_chain.func
+
+
+def _clear_market_caches() -> None:
+    """Drop memoised LTP, quote and option-chain results, e.g. after the session is invalidated."""
+    _get_angel_ltp.cache_clear()
+    _get_angel_quote.cache_clear()
+    _get_angel_option_chain.cache_clear()
+
+
+# The fallback chain depends only on the snapped ATM strike, so its columns are
+# built once per strike and handed out as fresh lists.
+@functools.lru_cache(maxsize=32)
+def _simulated_chain_columns(atm_strike: int) -> Dict[str, tuple]:
+    strikes = atm_strike + np.arange(-10, 11) * NIFTY_STRIKE_STEP
+    n = 2 * len(strikes)
+    return {
+        "strike": tuple(np.repeat(strikes, 2).tolist()),
+        "type": ("CE", "PE") * len(strikes),
+        "last_price": (100.0,) * n,
+        "volume": (1000,) * n,
+        "oi": (50000,) * n,
+        "iv": (0.18,) * n
+    }
+
+
 def _generate_simulated_option_chain(spot_price: float, atm_strike: int, expiry_date: str) -> Dict[str, Any]:
-    chain = []
-    for s in [atm_strike + (i * 50) for i in range(-10, 11)]:
-        for t in ["CE", "PE"]:
-            chain.append({
-                "strike": s,
-                "type": t,
-                "last_price": 100.0,
-                "volume": 1000,
-                "oi": 50000,
-                "iv": 0.18
-            })
+    chain = {k: list(v) for k, v in _simulated_chain_columns(atm_strike).items()}
     return {
         "status": "success",
         "spot_price": spot_price,
@@ -435,115 +1011,337 @@ def _generate_simulated_option_chain(spot_price: float, atm_strike: int, expiry_
     }
 
 
+def _float_or_nan(value: Any) -> float:
+    # Numbers and missing values are settled by type checks; only strings can
+    # fail to parse, so only they pay for exception handling.
+    if isinstance(value, (float, int)):
+        return float(value)
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+_OHLC = namedtuple("_OHLC", "close high low")
+
+
+def _ohlc_length(data: Any) -> int:
+    """Number of bars in OHLC data given as records or as a dict of columns."""
+    if isinstance(data, dict):
+        return len(data.get("close") or ())
+    return len(data)
+
+
+def _ohlc_arrays(records: Any) -> _OHLC:
+    """Close/high/low float64 arrays from OHLC data, dropping bars without a close.
+
+    Accepts a list of per-bar dicts or the columnar dict returned by
+    get_angel_historical_data. Unparseable values become NaN, as
+    pd.to_numeric(errors="coerce") did.
+    """
+    n = _ohlc_length(records)
+    if isinstance(records, dict):
+        def column(field):
+            values = records.get(field)
+            if values is None or len(values) != n:
+                return np.full(n, np.nan)
+            return np.fromiter(map(_float_or_nan, values), dtype=np.float64, count=n)
+    else:
+        def column(field):
+            return np.fromiter((_float_or_nan(r.get(field)) for r in records), dtype=np.float64, count=n)
+    close, high, low = (column(field) for field in ("close", "high", "low"))
+    keep = ~np.isnan(close)
+    if not keep.all():
+        close, high, low = close[keep], high[keep], low[keep]
+    return _OHLC(close, high, low)
+
+
+@_njit(cache=True)
+def _ema_bank(x, alphas):
+    """Several adjust=False EMAs of ``x`` in a single pass; one column per alpha."""
+    n, k = len(x), len(alphas)
+    out = np.empty((n, k))
+    if n == 0:
+        return out
+    state = np.full(k, x[0])
+    for i in range(n):
+        xi = x[i]
+        for j in range(k):
+            state[j] = alphas[j] * xi + (1.0 - alphas[j]) * state[j]
+            out[i, j] = state[j]
+    return out
+
+
+def _emas(x: np.ndarray, spans: List[int]) -> np.ndarray:
+    """EMA columns for ``spans``, matching ``Series.ewm(span=..., adjust=False).mean()``."""
+    if _HAVE_NUMBA:
+        return _ema_bank(x, 2.0 / (np.asarray(spans, dtype=np.float64) + 1.0))
+    # Without numba the loop above is interpreted; pandas' C ewm is faster.
+    series = pd.Series(x)
+    return np.column_stack([series.ewm(span=span, adjust=False).mean().to_numpy() for span in spans])
+
+
+@_njit(cache=True)
+def _wilder_rsi_kernel(close, period):
+    n = len(close)
+    rsi = np.full(n, np.nan)
+    if n <= period:
+        return rsi
+    avg_up = 0.0
+    avg_dn = 0.0
+    for i in range(1, period + 1):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            avg_up += d
+        else:
+            avg_dn -= d
+    avg_up /= period
+    avg_dn /= period
+    for i in range(period, n):
+        if i > period:
+            d = close[i] - close[i - 1]
+            avg_up = (avg_up * (period - 1) + (d if d > 0 else 0.0)) / period
+            avg_dn = (avg_dn * (period - 1) + (-d if d < 0 else 0.0)) / period
+        if avg_dn > 0:
+            rsi[i] = 100.0 - 100.0 / (1.0 + avg_up / avg_dn)
+        elif avg_up > 0:
+            rsi[i] = 100.0
+    return rsi
+
+
+def _wilder_smooth(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder average of NaN-free ``x``: SMA seed at index period-1, then avg = (avg*(p-1) + x)/p.
+
+    That recurrence is an adjust=False EWM with alpha=1/period once the first
+    point is the seed, so pandas runs it in C.
+    """
+    out = np.full(len(x), np.nan)
+    if len(x) < period:
+        return out
+    seeded = np.concatenate(([x[:period].mean()], x[period:]))
+    out[period - 1:] = pd.Series(seeded).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+    return out
+
+
+def _wilder_rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI: SMA seed over the first ``period`` changes, then avg = (avg*(p-1) + x)/p."""
+    if _HAVE_NUMBA or len(close) <= period:
+        return _wilder_rsi_kernel(close, period)
+    delta = np.diff(close)
+    avg_up = _wilder_smooth(np.maximum(delta, 0.0), period)
+    avg_dn = _wilder_smooth(np.maximum(-delta, 0.0), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(avg_dn > 0, 100.0 - 100.0 / (1.0 + avg_up / avg_dn),
+                       np.where(avg_up > 0, 100.0, np.nan))
+    return np.concatenate(([np.nan], rsi))
+
+
+@_njit(cache=True)
+def _atr_kernel(high, low, close, window):
+    """Wilder ATR in one pass: true range, SMA seed, then atr = (atr*(w-1) + tr)/w.
+
+    A bar's TR is the largest of its non-NaN candidates (the first bar has no
+    previous close). Bars whose TR is entirely NaN are skipped and carry the
+    previous ATR forward.
+    """
+    n = len(close)
+    atr = np.full(n, np.nan)
+    total = 0.0
+    count = 0
+    avg = np.nan
+    for i in range(n):
+        t = high[i] - low[i]
+        if i > 0:
+            pc = close[i - 1]
+            up = abs(high[i] - pc)
+            if t != t or up > t:
+                t = up
+            dn = abs(low[i] - pc)
+            if t != t or dn > t:
+                t = dn
+        if t == t:
+            if count < window:
+                total += t
+                count += 1
+                if count == window:
+                    avg = total / window
+            else:
+                avg = (avg * (window - 1) + t) / window
+        if count >= window:
+            atr[i] = avg
+    return atr
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Average true range with Wilder smoothing."""
+    if _HAVE_NUMBA:
+        return _atr_kernel(high, low, close, window)
+    # fmax skips NaN candidates, so a TR is NaN only if high and low both are.
+    prev_c = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(np.fmax(high - low, np.abs(high - prev_c)), np.abs(low - prev_c))
+    valid = ~np.isnan(tr)
+    atr = np.full(len(tr), np.nan)
+    atr[valid] = _wilder_smooth(tr[valid], window)
+    # Forward-fill skipped bars: index each bar by the last valid bar at or before it.
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(tr)), 0))
+    return atr[last_valid]
+
+
+# Indexed by sign(ema_5 - ema_20): 0 neutral, 1 bullish, -1 (last) bearish.
+# A NaN EMA compares false both ways and lands on neutral, as before.
+_TRENDS = ("neutral", "bullish", "bearish")
+
+
+def _technical_indicators_core(c: np.ndarray, h: np.ndarray, l: np.ndarray) -> Dict[str, Any]:
+    """Indicator result for NaN-free closes ``c`` (>= 20 bars) and matching highs/lows.
+
+    Callers that already hold float64 arrays use this directly and skip
+    record parsing; calculate_technical_indicators is the record adapter.
+    """
+    # Calculate EMAs. The trend and MACD EMAs share one pass over close.
+    ema_5, ema_20, ema_50, ema_12, ema_26 = _emas(c, [5, 20, 50, 12, 26]).T
+
+    # Calculate RSI (Wilder smoothing)
+    rsi = _wilder_rsi(c, 14)
+
+    # Calculate MACD
+    macd = ema_12 - ema_26
+    macd_signal = _emas(macd, [9])[:, 0]
+
+    # Calculate Bollinger Bands. Only the latest band is reported, so reduce
+    # the last 20 closes directly instead of building rolling series.
+    window = c[-20:]
+    mid = window.mean()
+    std = window.std(ddof=1)
+
+    # Calculate ATR
+    atr = _atr(h, l, c, 14)
+
+    # Pull each indicator's latest value out once as a plain float.
+    vals = {
+        "rsi": float(rsi[-1]),
+        "macd": float(macd[-1]),
+        "macd_signal": float(macd_signal[-1]),
+        "ema_5": float(ema_5[-1]),
+        "ema_20": float(ema_20[-1]),
+        "ema_50": float(ema_50[-1]),
+        "bb_upper": float(mid + std * 2),
+        "bb_lower": float(mid - std * 2),
+        "atr": float(atr[-1])
+    }
+
+    # Analyze current state
+    fast, slow = vals["ema_5"], vals["ema_20"]
+    trend = _TRENDS[(fast > slow) - (fast < slow)]
+
+    # Generate signal
+    signal = "neutral"
+    confidence = 0.5
+    if trend == "bullish" and vals["rsi"] < 70 and vals["macd"] > vals["macd_signal"]:
+        signal, confidence = "bullish", 0.75
+    elif trend == "bearish" and vals["rsi"] > 30 and vals["macd"] < vals["macd_signal"]:
+        signal, confidence = "bearish", 0.75
+
+    return {
+        "status": "success",
+        "signal": signal,
+        "confidence": confidence,
+        "indicators": vals,
+        "key_levels": {
+            "support": float(np.nanmin(l)),
+            "resistance": float(np.nanmax(h)),
+            "current_price": float(c[-1])
+        },
+        "trend": trend,
+        "rationale": f"{trend.capitalize()} trend with RSI at {vals['rsi']:.1f}"
+    }
+
+
 @tool("Calculate Technical Indicators")
-def calculate_technical_indicators(historical_data: str) -> Dict[str, Any]:
+def calculate_technical_indicators(historical_data: Union[str, Dict[str, List], List[Dict]]) -> Dict[str, Any]:
     """Calculate EMA, RSI, MACD, Bollinger Bands, ATR and trend signals from historical OHLC data."""
     try:
-        # Parse the JSON string input - handles both string and list inputs
-        import json
+        # Parse the JSON string input - handles string, columnar dict and list inputs
         if isinstance(historical_data, str):
-            data_list = json.loads(historical_data)
+            data_list = _json_loads(historical_data)
         else:
             data_list = historical_data
         
-        if not data_list or len(data_list) < 20:
+        if not data_list or _ohlc_length(data_list) < 20:
             return {"status": "failed", "error": "insufficient_data"}
 
-        df = pd.DataFrame(data_list)
-        for col in ["close", "high", "low", "volume"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        df.dropna(subset=["close"], inplace=True)
-
-        # Calculate EMAs
-        for span in [5, 20, 50]:
-            df[f"ema_{span}"] = df["close"].ewm(span=span, adjust=False).mean()
-
-        # Calculate RSI
-        delta = df["close"].diff()
-        gain = delta.where(delta > 0, 0).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        df["rsi"] = 100 - (100 / (1 + gain / loss))
-
-        # Calculate MACD
-        df["macd"] = df["close"].ewm(span=12, adjust=False).mean() - df["close"].ewm(span=26, adjust=False).mean()
-        df["macd_signal"] = df["macd"].ewm(span=9, adjust=False).mean()
-
-        # Calculate Bollinger Bands
-        mid = df["close"].rolling(20).mean()
-        std = df["close"].rolling(20).std()
-        df["bb_upper"] = mid + std * 2
-        df["bb_lower"] = mid - std * 2
-
-        # Calculate ATR
-        h, l, c = df["high"], df["low"], df["close"]
-        tr = pd.concat([h - l, (h - c.shift()).abs(), (l - c.shift()).abs()], axis=1).max(axis=1)
-        df["atr"] = tr.rolling(14).mean()
-
-        # Analyze current state
-        curr = df.iloc[-1]
-        trend = "bullish" if curr["ema_5"] > curr["ema_20"] else "bearish" if curr["ema_5"] < curr["ema_20"] else "neutral"
-
-        # Generate signal
-        signal = "neutral"
-        confidence = 0.5
-        if trend == "bullish" and curr["rsi"] < 70 and curr["macd"] > curr["macd_signal"]:
-            signal, confidence = "bullish", 0.75
-        elif trend == "bearish" and curr["rsi"] > 30 and curr["macd"] < curr["macd_signal"]:
-            signal, confidence = "bearish", 0.75
+        c, h, l = _ohlc_arrays(data_list)
+        # Rows without a parseable close are dropped; re-check before any maths.
+        if len(c) < 20:
+            return {"status": "failed", "error": "insufficient_data"}
 
-        return {
-            "status": "success",
-            "signal": signal,
-            "confidence": float(confidence),
-            "indicators": {
-                "rsi": float(curr["rsi"]),
-                "macd": float(curr["macd"]),
-                "macd_signal": float(curr["macd_signal"]),
-                "ema_5": float(curr["ema_5"]),
-                "ema_20": float(curr["ema_20"]),
-                "ema_50": float(curr["ema_50"]),
-                "bb_upper": float(curr["bb_upper"]),
-                "bb_lower": float(curr["bb_lower"]),
-                "atr": float(curr["atr"])
-            },
-            "key_levels": {
-                "support": float(df["low"].min()),
-                "resistance": float(df["high"].max()),
-                "current_price": float(curr["close"])
-            },
-            "trend": trend,
-            "rationale": f"{trend.capitalize()} trend with RSI at {curr['rsi']:.1f}"
-        }
+        return _technical_indicators_core(c, h, l)
     except Exception as e:
         logger.exception(f"Technical Indicator Exception: {e}")
         return {"status": "failed", "error": "exception", "message": str(e)}
 
 
+_calculate_technical_indicators = calculate_technical_indicators.func
+
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2 * math.pi)
+_INV_SQRT_2 = 1.0 / math.sqrt(2)
+
+
+# Standard normal density and distribution written out directly: scipy.stats.norm
+# goes through rv_continuous argument handling that costs more than the maths.
+def _norm_pdf(x: float) -> float:
+    return _INV_SQRT_2PI * math.exp(-0.5 * x * x)
+
+
+def _norm_cdf(x: float) -> float:
+    return 0.5 * math.erfc(-x * _INV_SQRT_2)
+
+
+def _days_to_expiry(expiry: str) -> int:
+    """Whole days from now to an ISO expiry date, at least 1.
+
+    Works on day ordinals. The -1 keeps the previous (expiry_midnight - now).days
+    result, which floors to one day fewer once any of today has elapsed.
+    """
+    return max(1, date.fromisoformat(expiry).toordinal() - date.today().toordinal() - 1)
+
+
 @tool("Calculate Options Greeks")
 def calculate_options_greeks(spot: float, strike: float, expiry: str, opt_type: str,
                               volatility: float = 0.18, risk_free_rate: float = 0.065) -> Dict[str, Any]:
     """Calculate Black-Scholes Greeks."""
     try:
-        from scipy.stats import norm
-
-        T = max(1, (datetime.strptime(expiry, "%Y-%m-%d") - datetime.now()).days) / 365.0
+        days = _days_to_expiry(expiry)
+        T = days / 365.0
         S, K = spot, strike
         r, sigma = risk_free_rate, volatility
 
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
+        # Scalar inputs: math is far cheaper than numpy ufuncs here, and each
+        # shared subexpression (sqrt(T), discount, pdf(d1)) is evaluated once.
+        sqrt_t = math.sqrt(T)
+        sig_sqrt_t = sigma * sqrt_t
+        disc_k = K * math.exp(-r * T)
+        d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / sig_sqrt_t
+        d2 = d1 - sig_sqrt_t
+        pdf_d1 = _norm_pdf(d1)
+        decay = -(S * pdf_d1 * sigma) / (2 * sqrt_t)
 
         if opt_type in ("CE", "call"):
-            delta = float(norm.cdf(d1))
-            theta = float((-(S * norm.pdf(d1) * sigma) / (2 * np.sqrt(T)) - r * K * np.exp(-r * T) * norm.cdf(d2)) / 365)
-            rho = float(K * T * np.exp(-r * T) * norm.cdf(d2) / 100)
+            delta = _norm_cdf(d1)
+            cdf_d2 = _norm_cdf(d2)
+            theta = (decay - r * disc_k * cdf_d2) / 365
+            rho = disc_k * T * cdf_d2 / 100
         else:
-            delta = float(-norm.cdf(-d1))
-            theta = float((-(S * norm.pdf(d1) * sigma) / (2 * np.sqrt(T)) + r * K * np.exp(-r * T) * norm.cdf(-d2)) / 365)
-            rho = float(-K * T * np.exp(-r * T) * norm.cdf(-d2) / 100)
+            delta = -_norm_cdf(-d1)
+            cdf_md2 = _norm_cdf(-d2)
+            theta = (decay + r * disc_k * cdf_md2) / 365
+            rho = -disc_k * T * cdf_md2 / 100
 
-        gamma = float(norm.pdf(d1) / (S * sigma * np.sqrt(T)))
-        vega = float(S * norm.pdf(d1) * np.sqrt(T) / 100)
+        gamma = pdf_d1 / (S * sig_sqrt_t)
+        vega = S * pdf_d1 * sqrt_t / 100
 
         return {
             "status": "success",
@@ -555,86 +1353,264 @@ def calculate_options_greeks(spot: float, strike: float, expiry: str, opt_type:
             "vega": vega,
             "rho": rho,
             "iv": volatility,
-            "days_to_expiry": int(T * 365)
+            "days_to_expiry": days
         }
     except Exception as e:
         return {"status": "failed", "error": "exception", "message": str(e)}
 
 
+_calculate_options_greeks = calculate_options_greeks.func
+
+
+def _greeks_vec(S: float, K: np.ndarray, T: float, r: float, sigma: float,
+                is_call: np.ndarray) -> Dict[str, np.ndarray]:
+    """Black-Scholes Greeks for a whole strike array in one broadcast pass."""
+    sqrt_t = math.sqrt(T)
+    sig_sqrt_t = sigma * sqrt_t
+    disc_k = K * math.exp(-r * T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / sig_sqrt_t
+    d2 = d1 - sig_sqrt_t
+    pdf_d1 = _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+    # Puts use N(-x) = 1 - N(x); evaluate the CDF once on the signed argument.
+    sign = np.where(is_call, 1.0, -1.0)
+    cdf_sd1 = ndtr(sign * d1)
+    cdf_sd2 = ndtr(sign * d2)
+    return {
+        "delta": sign * cdf_sd1,
+        "gamma": pdf_d1 / (S * sig_sqrt_t),
+        "theta": (-(S * pdf_d1 * sigma) / (2 * sqrt_t) - sign * r * disc_k * cdf_sd2) / 365,
+        "vega": S * pdf_d1 * sqrt_t / 100,
+        "rho": sign * disc_k * T * cdf_sd2 / 100
+    }
+
+
+@tool("Calculate Options Greeks Batch")
+def calculate_options_greeks_batch(spot: float, strikes: List[float], opt_types: List[str], expiry: str,
+                                    volatility: float = 0.18, risk_free_rate: float = 0.065) -> Dict[str, Any]:
+    """Calculate Black-Scholes Greeks for many strikes at once (strikes[i] pairs with opt_types[i])."""
+    try:
+        if len(strikes) != len(opt_types):
+            return {"status": "failed", "error": "length_mismatch",
+                    "message": "strikes and opt_types must have the same length"}
+
+        days = _days_to_expiry(expiry)
+        T = days / 365.0
+        K = np.asarray(strikes, dtype=np.float64)
+        is_call = np.isin(np.asarray(opt_types), ("CE", "call"))
+        greeks = _greeks_vec(spot, K, T, risk_free_rate, volatility, is_call)
+
+        return {
+            "status": "success",
+            "strike": list(strikes),
+            "type": list(opt_types),
+            **{name: values.tolist() for name, values in greeks.items()},
+            "iv": volatility,
+            "days_to_expiry": days
+        }
+    except Exception as e:
+        return {"status": "failed", "error": "exception", "message": str(e)}
+
+
+_STRATEGY_CODES = {"long_call": 0, "long_put": 1, "short_call": 2, "short_put": 3, "straddle": 4}
+
+
+@_njit(cache=True)
+def _backtest_pnl_kernel(closes, strike, premium, lot_size, code):
+    """Per-bar P&L in a single pass, with no intermediate arrays."""
+    n = len(closes) - 1
+    pnl = np.zeros(max(n, 0))
+    if code < 0 or code > 4:
+        return pnl
+    for i in range(n):
+        x = closes[i + 1]
+        if code == 0:
+            p = max(x - strike, 0.0) - premium
+        elif code == 1:
+            p = max(strike - x, 0.0) - premium
+        elif code == 2:
+            p = premium - max(x - strike, 0.0)
+        elif code == 3:
+            p = premium - max(strike - x, 0.0)
+        else:
+            p = abs(x - strike) - 2 * premium
+        pnl[i] = p * lot_size
+    return pnl
+
+
+def _backtest_pnl(closes: np.ndarray, strike: float, premium: float, lot_size: float, code: int) -> np.ndarray:
+    """Per-bar P&L of holding the strategy from close[i] to close[i + 1]."""
+    if _HAVE_NUMBA:
+        return _backtest_pnl_kernel(closes, strike, premium, lot_size, code)
+    exit_p = closes[1:]
+    if code == 0:
+        pnl = np.maximum(exit_p - strike, 0.0) - premium
+    elif code == 1:
+        pnl = np.maximum(strike - exit_p, 0.0) - premium
+    elif code == 2:
+        pnl = premium - np.maximum(exit_p - strike, 0.0)
+    elif code == 3:
+        pnl = premium - np.maximum(strike - exit_p, 0.0)
+    elif code == 4:
+        # max(S-K, 0) + max(K-S, 0) is |S-K|: one buffer, updated in place.
+        pnl = np.subtract(exit_p, strike)
+        np.abs(pnl, out=pnl)
+        pnl -= 2 * premium
+    else:
+        pnl = np.zeros_like(exit_p)
+    # Every branch produced a fresh array, so scale it in place.
+    pnl *= lot_size
+    return pnl
+
+
+@_njit(cache=True)
+def _pnl_stats_kernel(pnl):
+    """(mean, population std, max drawdown, wins) of a P&L series in one pass.
+
+    Uses Welford's update for the variance so large, similar P&Ls do not lose
+    precision the way sum-of-squares would.
+    """
+    n = len(pnl)
+    mean = 0.0
+    m2 = 0.0
+    cum = 0.0
+    peak = 0.0
+    max_dd = 0.0
+    wins = 0
+    for i in range(n):
+        x = pnl[i]
+        if x > 0:
+            wins += 1
+        delta = x - mean
+        mean += delta / (i + 1)
+        m2 += delta * (x - mean)
+        cum += x
+        # The running peak starts at the first cumulative value, as
+        # np.maximum.accumulate does.
+        if i == 0 or cum > peak:
+            peak = cum
+        elif peak - cum > max_dd:
+            max_dd = peak - cum
+    std = math.sqrt(m2 / n) if n > 0 else 0.0
+    return mean, std, max_dd, wins
+
+
+def _pnl_stats(pnl: np.ndarray) -> tuple:
+    """(mean, std, max_drawdown, wins) of the per-bar P&L."""
+    if _HAVE_NUMBA:
+        return _pnl_stats_kernel(pnl)
+    cumulative = np.cumsum(pnl)
+    max_drawdown = float(np.max(np.maximum.accumulate(cumulative) - cumulative)) if len(cumulative) else 0.0
+    return float(np.mean(pnl)), float(np.std(pnl)), max_drawdown, int((pnl > 0).sum())
+
+
 @tool("Backtest Option Strategy")
-def backtest_option_strategy(strategy_type: str, historical_data: List[Dict],
+def backtest_option_strategy(strategy_type: str, historical_data: Union[List[Dict], Dict[str, List]],
                               strike: int, premium: float, lot_size: int = 50) -> Dict[str, Any]:
     """Simple Backtest."""
     try:
-        if not historical_data or len(historical_data) < 10:
+        if not historical_data or _ohlc_length(historical_data) < 10:
             return {"status": "failed", "error": "insufficient_data"}
 
-        df = pd.DataFrame(historical_data)
-        closes = pd.to_numeric(df["close"], errors="coerce").dropna().tolist()
-        trades = []
-        wins = 0
-
-        for i in range(len(closes) - 1):
-            exit_p = closes[i + 1]
-            if strategy_type == "long_call":
-                pnl = max(0, exit_p - strike) - premium
-            elif strategy_type == "long_put":
-                pnl = max(0, strike - exit_p) - premium
-            elif strategy_type == "short_call":
-                pnl = premium - max(0, exit_p - strike)
-            elif strategy_type == "short_put":
-                pnl = premium - max(0, strike - exit_p)
-            elif strategy_type == "straddle":
-                pnl = max(0, exit_p - strike) + max(0, strike - exit_p) - 2 * premium
-            else:
-                pnl = 0
-
-            pnl_val = pnl * lot_size
-            trades.append(pnl_val)
-            if pnl_val > 0:
-                wins += 1
-
+        closes = _ohlc_arrays(historical_data).close
+        if len(closes) < 10:
+            return {"status": "failed", "error": "insufficient_data"}
+        code = _STRATEGY_CODES.get(strategy_type, -1)
+        trades = _backtest_pnl(closes, float(strike), float(premium), float(lot_size), code)
         total_trades = len(trades)
-        returns = np.array(trades)
-        sharpe = float(np.mean(returns) / np.std(returns)) if np.std(returns) > 0 else 0.0
-        cumulative = np.cumsum(returns)
-        max_drawdown = float(np.max(np.maximum.accumulate(cumulative) - cumulative)) if len(cumulative) else 0.0
+        avg_pnl, std_pnl, max_drawdown, wins = _pnl_stats(trades)
+        sharpe = avg_pnl / std_pnl if std_pnl > 0 else 0.0
 
         return {
             "status": "success",
             "strategy": strategy_type,
-            "win_rate": float(wins / total_trades) if total_trades else 0.0,
-            "avg_pnl": float(np.mean(returns)),
-            "max_drawdown": max_drawdown,
-            "sharpe": sharpe,
+            "win_rate": wins / total_trades if total_trades else 0.0,
+            "avg_pnl": float(avg_pnl),
+            "max_drawdown": float(max_drawdown),
+            "sharpe": float(sharpe),
             "total_trades": total_trades,
-            "wins": wins,
-            "losses": total_trades - wins
+            "wins": int(wins),
+            "losses": total_trades - int(wins)
         }
     except Exception as e:
         logger.exception(f"Backtest Exception: {e}")
         return {"status": "failed", "error": "exception", "message": str(e)}
 
 
+_POSITIVE_WORDS = frozenset([
+    "rally", "surge", "gain", "bull", "bullish", "up", "rise", "strong",
+    "positive", "growth", "profit", "high", "record", "boost", "optimistic"
+])
+_NEGATIVE_WORDS = frozenset([
+    "fall", "drop", "bear", "bearish", "down", "decline", "weak", "negative",
+    "loss", "low", "crash", "sell", "selloff", "pessimistic", "concern"
+])
+
+
+def _keyword_re(words) -> re.Pattern:
+    # Longest first so "bullish" is tried before "bull" at the same position.
+    alternation = "|".join(sorted(map(re.escape, words), key=len, reverse=True))
+    return re.compile(r"\b(?:" + alternation + r")\b", re.IGNORECASE)
+
+
+_POSITIVE_RE = _keyword_re(_POSITIVE_WORDS)
+_NEGATIVE_RE = _keyword_re(_NEGATIVE_WORDS)
+
+
+def _keyword_automaton(words):
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for w in words:
+        automaton.add_word(w, w)
+    automaton.make_automaton()
+    return automaton
+
+
+_POSITIVE_AC = _keyword_automaton(_POSITIVE_WORDS)
+_NEGATIVE_AC = _keyword_automaton(_NEGATIVE_WORDS)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _count_keywords(text: str, lower: str, automaton, pattern: re.Pattern) -> int:
+    """Number of distinct keywords that occur in ``text`` as whole words."""
+    if automaton is None:
+        return len({m.lower() for m in pattern.findall(text)})
+    found = set()
+    n = len(lower)
+    for end, word in automaton.iter(lower):
+        start = end - len(word) + 1
+        # Same boundary rule as the regex's \b on either side of the match.
+        if start > 0 and _is_word_char(lower[start - 1]):
+            continue
+        if end + 1 < n and _is_word_char(lower[end + 1]):
+            continue
+        found.add(word)
+    return len(found)
+
+
 @tool("Analyze Sentiment from Text")
 def analyze_sentiment_from_text(text: str) -> Dict[str, Any]:
     """Keyword Sentiment."""
     try:
-        pos = ["rally", "surge", "gain", "bull", "bullish", "up", "rise", "strong",
-               "positive", "growth", "profit", "high", "record", "boost", "optimistic"]
-        neg = ["fall", "drop", "bear", "bearish", "down", "decline", "weak", "negative",
-               "loss", "low", "crash", "sell", "selloff", "pessimistic", "concern"]
-        lower = text.lower()
-        pc = sum(1 for w in pos if w in lower)
-        nc = sum(1 for w in neg if w in lower)
+        if not text or text.isspace():
+            pc = nc = 0
+        else:
+            # Whole-word matches, each keyword counted once: substring tests
+            # counted "up" in "support" and "low" in "follow".
+            lower = text.lower()
+            pc = _count_keywords(text, lower, _POSITIVE_AC, _POSITIVE_RE)
+            nc = _count_keywords(text, lower, _NEGATIVE_AC, _NEGATIVE_RE)
         total = pc + nc
-        score = float((pc - nc) / total) if total > 0 else 0.0
+        score = (pc - nc) / total if total > 0 else 0.0
 
         return {
             "status": "success",
             "sentiment_score": score,
             "sentiment": "positive" if score > 0.2 else "negative" if score < -0.2 else "neutral",
-            "confidence": min(0.9, abs(score) + 0.3),
+            "confidence": min(0.9, math.fabs(score) + 0.3),
             "positive_indicators": pc,
             "negative_indicators": nc
         }
@@ -669,7 +1645,7 @@ def test_all_apis() -> Dict[str, Any]:
     print("TESTING ANGEL ONE SMARTAPI INTEGRATION")
     print("=" * 70 + "\n")
 
-    auth_result = authenticate_angel.func()
+    auth_result = _authenticate_angel()
     results["tests"]["authentication"] = {
         "status": auth_result.get("status"),
         "message": auth_result.get("message", auth_result.get("error"))
@@ -678,41 +1654,50 @@ def test_all_apis() -> Dict[str, Any]:
         results["status"] = "failed"
         return results
 
-    ltp_result = get_angel_ltp.func()
-    results["tests"]["ltp"] = {"status": ltp_result.get("status"), "value": ltp_result.get("ltp")}
-
-    quote_result = get_angel_quote.func()
-    results["tests"]["quote"] = {"status": quote_result.get("status")}
-
-    hist_result = get_angel_historical_data.func(days=30)
-    results["tests"]["historical"] = {"status": hist_result.get("status"), "records": hist_result.get("count", 0)}
-
-    expiries = find_nifty_expiry_dates.func(1)
-    next_expiry = expiries[0] if expiries else None
-
-    if next_expiry:
-        chain_result = get_angel_option_chain.func(next_expiry)
-        results["tests"]["option_chain"] = {
-            "status": chain_result.get("status"),
-            "data_source": chain_result.get("data_source"),
-            "strikes": len(chain_result.get("option_chain", []))
-        }
+    # Once authenticated these four calls are independent; overlap their round-trips.
+    # The option chain reuses the cached LTP, so it is submitted only after they
+    # finish; the local indicator and Greeks maths then runs while it is in flight.
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        ltp_future = pool.submit(_get_angel_ltp)
+        quote_future = pool.submit(_get_angel_quote)
+        hist_future = pool.submit(_get_angel_historical_data, days=30)
+        expiries_future = pool.submit(_find_nifty_expiry_dates, 1)
+
+        ltp_result = ltp_future.result()
+        quote_result = quote_future.result()
+        hist_result = hist_future.result()
+        expiries = expiries_future.result()
+
+        next_expiry = expiries[0] if expiries else None
+        chain_future = pool.submit(_get_angel_option_chain, next_expiry) if next_expiry else None
+
+        results["tests"]["ltp"] = {"status": ltp_result.get("status"), "value": ltp_result.get("ltp")}
+        results["tests"]["quote"] = {"status": quote_result.get("status")}
+        results["tests"]["historical"] = {"status": hist_result.get("status"), "records": hist_result.get("count", 0)}
+
+        if hist_result.get("status") == "success":
+            tech_result = _calculate_technical_indicators(hist_result.get("data", []))
+            results["tests"]["technical_indicators"] = {
+                "status": tech_result.get("status"),
+                "signal": tech_result.get("signal")
+            }
 
-    if hist_result.get("status") == "success":
-        tech_result = calculate_technical_indicators.func(hist_result.get("data", []))
-        results["tests"]["technical_indicators"] = {
-            "status": tech_result.get("status"),
-            "signal": tech_result.get("signal")
-        }
+        if ltp_result.get("status") == "success" and next_expiry:
+            spot = ltp_result.get("ltp")
+            atm_strike = _strike_window(spot)[0]
+            greeks_result = _calculate_options_greeks(spot, atm_strike, next_expiry, "CE")
+            results["tests"]["greeks"] = {
+                "status": greeks_result.get("status"),
+                "delta": greeks_result.get("delta")
+            }
 
-    if ltp_result.get("status") == "success" and next_expiry:
-        spot = ltp_result.get("ltp")
-        atm_strike = round(spot / 50) * 50
-        greeks_result = calculate_options_greeks.func(spot, atm_strike, next_expiry, "CE")
-        results["tests"]["greeks"] = {
-            "status": greeks_result.get("status"),
-            "delta": greeks_result.get("delta")
-        }
+        if chain_future is not None:
+            chain_result = chain_future.result()
+            results["tests"]["option_chain"] = {
+                "status": chain_result.get("status"),
+                "data_source": chain_result.get("data_source"),
+                "strikes": len(chain_result.get("option_chain", {}).get("strike", []))
+            }
 
     all_ok = all(t.get("status") in ("success", "skipped") for t in results["tests"].values())
     results["status"] = "success" if all_ok else "partial"
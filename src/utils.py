@@ -1,19 +1,53 @@
 import os
+import sys
+from functools import lru_cache
 from pathlib import Path
 
-# src/ directory — where this file lives
-_SRC_DIR = Path(__file__).parent
+# src/ directory — where this file lives. Paths are kept as plain strings and
+# joined with os.path, which is much cheaper than building Path objects.
+# realpath (not abspath) so a symlinked deployment still finds the real tree.
+_SRC_DIR = os.path.dirname(os.path.realpath(__file__))
+# This file is at /app/src/utils.py so parent.parent = /app. __file__ never
+# changes, so the root is computed once at import.
+_PROJECT_ROOT_STR = os.path.dirname(_SRC_DIR)
+# FIX: config/ lives at project root /app/config/, NOT inside src/
+# OPTITRADE_CONFIG_DIR relocates it (e.g. a mounted volume) without code edits;
+# it is read once at import.
+_CONFIG_DIR = os.path.realpath(
+    os.getenv("OPTITRADE_CONFIG_DIR") or os.path.join(_PROJECT_ROOT_STR, "config")
+)
 
+# Everything internal is a string; a Path is only built for callers that ask.
+@lru_cache(maxsize=None)
 def get_project_root() -> Path:
-    """Returns the absolute path to the project root directory."""
-    # This file is at /app/src/utils.py so parent.parent = /app
-    return _SRC_DIR.parent
+    """Returns the absolute path to the project root directory.
 
+    The same resolved Path instance is returned on every call.
+    """
+    return Path(_PROJECT_ROOT_STR)
+
+# Results are plain strings fixed by the filename, so repeat lookups are
+# cached. Interning makes equal paths the same object even once an entry has
+# been evicted and rebuilt.
+@lru_cache(maxsize=256)
 def get_config_path(filename: str) -> str:
     """Returns the absolute path to a config file inside root/config/."""
-    # FIX: config/ lives at project root /app/config/, NOT inside src/
-    return str(get_project_root() / "config" / filename)
+    return sys.intern(os.path.join(_CONFIG_DIR, filename))
+
+# The config files the crew actually loads, exposed as module constants
+# (PEP 562): each is resolved on first access, then stored in the module dict
+# so later reads are plain attribute lookups. Attribute access never raises
+# anything but AttributeError (hasattr/getattr defaults rely on that); a
+# missing file is reported when CrewAI loads the YAML.
+_LAZY_CONFIG_PATHS = {
+    "AGENTS_CONFIG_PATH": "agents.yaml",
+    "TASKS_CONFIG_PATH": "tasks.yaml",
+}
 
-def get_output_path(filename: str) -> str:
-    """Returns the absolute path to an output file inside root/output/."""
-    return str(get_project_root() / "output" / filename)
\ No newline at end of file
+def __getattr__(name: str) -> str:
+    filename = _LAZY_CONFIG_PATHS.get(name)
+    if filename is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = get_config_path(filename)
+    globals()[name] = value
+    return value
\ No newline at end of file